@@ -2,8 +2,9 @@
 """
 Unified script to load ocean current data, generate distribution table, and plot wind rose.
 """
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 import argparse
+import functools
 import os
 import logging
 
@@ -12,10 +13,150 @@ import numpy as np
 import matplotlib.pyplot as plt
 from windrose import WindroseAxes
 
+try:
+    from fast_histogram import histogram2d
+except ImportError:  # optional dependency, fall back to NumPy
+    histogram2d = None
+
+# default speed bin edges (m/s) and direction sector centers (°)
+SPEED_THRESHOLDS = np.arange(0, 0.51, 0.05).tolist()
+DIRECTION_BINS = list(np.arange(0, 361, 30))
+N_SECTORS = 12
+
+SEASONS = {'DJF': [12, 1, 2], 'MAM': [3, 4, 5], 'JJA': [6, 7, 8], 'SON': [9, 10, 11]}
+MONTHS = {
+    name: number for number, name in enumerate(
+        ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+         'August', 'September', 'October', 'November', 'December'],
+        start=1
+    )
+}
+
+
+def _period_mask(df: pd.DataFrame, period: str) -> np.ndarray:
+    """
+    Boolean mask of the rows of df that fall in period (month name or season code, any case).
+    Uses the precomputed int8 '_month' column when present instead of the DatetimeIndex.
+    """
+    if '_month' in df:
+        months = df['_month'].to_numpy()
+    else:
+        months = df.index.month.to_numpy()
+    if period.upper() in SEASONS:
+        wanted = SEASONS[period.upper()]
+    elif period.capitalize() in MONTHS:
+        wanted = [MONTHS[period.capitalize()]]
+    else:
+        raise ValueError(f"Unknown period {period!r}: expected a month name or one of {list(SEASONS)}")
+    return np.isin(months, np.array(wanted, dtype=months.dtype))
+
+
+def _direction_sector(direction: np.ndarray) -> np.ndarray:
+    """
+    Index (0 to N_SECTORS-1) of the 30° sector of each direction, north (345°-15°) being sector 0.
+    """
+    return ((direction + 15.0) % 360.0 * (1.0 / 30.0)).astype(np.int8)
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_kernel(name: str) -> Optional[Callable]:
+    """
+    Import (and JIT-compile on first call) a Numba kernel from current_kernels.
+    Returns None when numba is not installed.
+    """
+    try:
+        import current_kernels
+    except ImportError:
+        return None
+    return getattr(current_kernels, name)
+
+
+def _count_speed_direction(
+    speed: np.ndarray,
+    direction: np.ndarray,
+    speed_thresholds: List[float]
+) -> np.ndarray:
+    """
+    Count observations per (speed bin, 30° direction sector), north sector first.
+    """
+    n_speed = len(speed_thresholds) - 1
+    lo, hi = speed_thresholds[0], speed_thresholds[-1]
+    widths = np.diff(speed_thresholds)
+    uniform = np.allclose(widths, widths[0])
+    if uniform:
+        kernel = _numba_kernel('bin_counts')
+        if kernel is not None:
+            return kernel(speed, direction, float(lo), float(widths[0]), n_speed)
+        if histogram2d is not None:
+            # wrap directions into [-15, 345) so that north (345°-15°) is a single bin
+            return histogram2d(
+                speed, (direction + 15.0) % 360.0 - 15.0,
+                bins=[n_speed, N_SECTORS], range=[[lo, hi], [-15.0, 345.0]]
+            )
+
+    # out-of-range and NaN speeds (NaN directions come with them) are dropped here
+    valid = (speed >= lo) & (speed < hi)
+    if uniform:
+        s_idx = ((speed[valid] - lo) * (n_speed / (hi - lo))).astype(np.intp)
+        # guard against round-off pushing values just below the upper edge out of range
+        np.minimum(s_idx, n_speed - 1, out=s_idx)
+    else:
+        # bins closed on the left, as in pd.cut(..., right=False)
+        s_idx = np.searchsorted(speed_thresholds, speed[valid], side='right') - 1
+    counts = np.bincount(
+        s_idx * N_SECTORS + _direction_sector(direction[valid]),
+        minlength=n_speed * N_SECTORS
+    )
+    return counts.reshape(n_speed, N_SECTORS)
+
+
+def compute_speed_direction(u: np.ndarray, v: np.ndarray, convention: str = 'math') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute current speed and direction from the u and v components in a single pass: a fused
+    Numba kernel when numba is installed, otherwise NumPy reusing the output buffers.
+
+    Parameters:
+    -----------
+    u, v       : eastward and northward components (numpy arrays)
+    convention : 'math' for degrees counter-clockwise from east, in [0, 360);
+                 'to' for the compass bearing the current flows towards, in (0, 360],
+                 calm = 0 (same as MetPy's wind_direction(..., convention='to'))
+    """
+    if convention not in ('math', 'to'):
+        raise ValueError("convention must be 'math' or 'to'")
+    kernel = _numba_kernel('speed_direction')
+    if kernel is not None:
+        return kernel(u, v, convention == 'to')
+
+    speed = np.hypot(u, v)
+    if convention == 'math':
+        direction = np.arctan2(v, u)
+        np.degrees(direction, out=direction)
+        direction += 360.0
+        np.fmod(direction, 360.0, out=direction)
+    elif convention == 'to':
+        direction = np.negative(v)
+        np.arctan2(direction, np.negative(u), out=direction)
+        np.degrees(direction, out=direction)
+        np.subtract(-90.0, direction, out=direction)
+        direction[direction <= 0.0] += 360.0
+        direction[speed == 0.0] = 0.0
+    return speed, direction
+
+
+def select_period(df: pd.DataFrame, period: Optional[str]) -> pd.DataFrame:
+    """
+    Rows of df in period (month name or season code); df itself when period is None.
+    Build this once and pass it with period=None to share the subset between the table and the plot.
+    """
+    if not period:
+        return df
+    return df[_period_mask(df, period)]
+
 
 def generate_current_distribution_table(
     df: pd.DataFrame,
-    depth: float,
+    depth: Optional[float] = None,
     speed_thresholds: Optional[List[float]] = None,
     direction_bins: Optional[List[float]] = None,
     period: Optional[str] = None,
@@ -27,7 +168,7 @@ def generate_current_distribution_table(
     Parameters:
     -----------
     df               : pd.DataFrame with columns ['st_ocean', 'velocidade', 'direcao'] and DatetimeIndex
-    depth            : depth (st_ocean) value for filtering
+    depth            : depth (st_ocean) value for filtering; None if df holds a single depth already
     speed_thresholds : optional list of speed bin edges (m/s)
     direction_bins   : optional list of direction bin centers (°)
     period           : optional filter by month name or season ('DJF', 'MAM', 'JJA', 'SON')
@@ -35,47 +176,42 @@ def generate_current_distribution_table(
 
     Returns:
     --------
-    pd.DataFrame: distribution table with MultiIndex columns (Direction, Degrees)
+    pd.DataFrame: distribution table (percent, unrounded) with MultiIndex columns (Direction, Degrees)
     """
     if speed_thresholds is None:
-        speed_thresholds = np.arange(0, 0.51, 0.05).tolist()
+        speed_thresholds = SPEED_THRESHOLDS
     if direction_bins is None:
-        direction_bins = list(np.arange(0, 361, 30))
+        direction_bins = DIRECTION_BINS
 
-    subset = df[df['st_ocean'] == depth]
+    subset = df if depth is None else df[df['st_ocean'] == depth]
+    if period:
+        subset = subset[_period_mask(subset, period)]
     speed = subset['velocidade']
     direction = subset['direcao']
 
-    if period:
-        seasons = {'DJF': [12,1,2], 'MAM': [3,4,5], 'JJA': [6,7,8], 'SON': [9,10,11]}
-        if period in seasons:
-            mask = speed.index.month.isin(seasons[period])
-        else:
-            month = pd.to_datetime(period, format='%B').month
-            mask = speed.index.month == month
-        speed = speed[mask]
-        direction = direction[mask]
-
-    current_df = pd.DataFrame({'speed': speed, 'direction': direction})
-
-    bins_dir = np.arange(-15, 375, 30)
-    labels_dir = direction_bins[:-1]
-    current_df['DirBin'] = pd.cut(current_df['direction'], bins=bins_dir, right=False, labels=labels_dir)
-    current_df.loc[current_df['direction'] > 345, 'DirBin'] = 0
+    speed_vals = speed.to_numpy()
+    counts = _count_speed_direction(speed_vals, direction.to_numpy(), speed_thresholds)
 
     labels_speed = [f"{round(speed_thresholds[i], 2)}-{round(speed_thresholds[i+1], 2)}" for i in range(len(speed_thresholds)-1)]
-    current_df['SpeedBin'] = pd.cut(current_df['speed'], bins=speed_thresholds, right=False, labels=labels_speed)
-
-    dist = pd.crosstab(current_df['SpeedBin'], current_df['DirBin'])
-    dist = dist * 100 / len(current_df)
+    dist = pd.DataFrame(
+        counts,
+        index=pd.Index(labels_speed, name='SpeedBin'),
+        columns=pd.Index(direction_bins[:-1], name='DirBin')
+    )
+    dist = dist * 100 / len(speed_vals)
+    # only the speed bins with observations are listed (and averaged in the Mean row);
+    # all the direction columns are kept
+    dist = dist[counts.sum(axis=1) > 0]
     if mode == 'accumulate':
         dist = dist.cumsum(axis=0)
-    dist = dist.round(2)
 
     dist['Omni'] = dist.sum(axis=1)
-    dist.loc['Total'] = dist.sum()
-    dist.loc['Mean'] = dist.iloc[:-1].mean().round(2)
-    dist.loc['Maximum'] = dist.iloc[:-2].max().round(2)
+    # with no observations at all the summary rows read 0
+    summary = pd.DataFrame(
+        [dist.sum(), dist.mean(), dist.max()],
+        index=pd.Index(['Total', 'Mean', 'Maximum'], name=dist.index.name)
+    ).fillna(0.0)
+    dist = pd.concat([dist, summary])
 
     if mode == 'accumulate':
         dist.index = [f'< {int(lbl)}' for lbl in dist.index[:-3]] + ['Total', 'Mean', 'Maximum']
@@ -86,49 +222,52 @@ def generate_current_distribution_table(
         [(directions[i], degrees[i]) for i in range(len(directions))],
         names=["Direction","Degrees"]
     )
-    dist = dist.round(2)
     return dist
 
 
 def plot_wind_rose(
     df: pd.DataFrame,
-    depth: float,
+    depth: Optional[float] = None,
     averaging_window: Optional[str] = None,
     colormap: str = 'viridis',
-    period: Optional[str] = None
+    period: Optional[str] = None,
+    ax: Optional[WindroseAxes] = None
 ) -> WindroseAxes:
     """
     Create a wind rose plot for specified depth and period.
+    Pass depth=None when df holds a single depth already, and an existing WindroseAxes as ax
+    to clear and redraw it instead of creating a new figure.
     """
-    subset = df[df['st_ocean'] == depth]
-    speed = subset['velocidade']
-    direction = subset['direcao']
-
+    subset = df if depth is None else df[df['st_ocean'] == depth]
     if period:
-        seasons = {'DJF': [12,1,2], 'MAM': [3,4,5], 'JJA': [6,7,8], 'SON': [9,10,11]}
-        if period in seasons:
-            mask = speed.index.month.isin(seasons[period])
-        else:
-            month = pd.to_datetime(period, format='%B').month
-            mask = speed.index.month == month
-        speed = speed[mask]
-        direction = direction[mask]
-
-    df_plot = pd.DataFrame({'speed': speed, 'direction': direction})
+        subset = subset[_period_mask(subset, period)]
     if averaging_window:
-        df_plot = df_plot.resample(averaging_window).mean()
+        subset = subset[['velocidade', 'direcao']].resample(averaging_window).mean()
+    speed = subset['velocidade'].to_numpy()
+    direction = subset['direcao'].to_numpy()
+    # rows below the sea floor are NaN, which windrose cannot bin
+    finite = np.isfinite(speed) & np.isfinite(direction)
+    speed = speed[finite]
+    direction = direction[finite]
 
     cmap = plt.get_cmap(colormap)
-    ax = WindroseAxes.from_ax()
-    ax.bar(
-        df_plot['direction'],
-        df_plot['speed'],
-        normed=True,
-        opening=0.8,
-        edgecolor='white',
-        cmap=cmap
-    )
-    ax.legend()
+    if ax is None:
+        ax = WindroseAxes.from_ax()
+    else:
+        ax.clear()
+        # clear() keeps the radial limit of the previous plot; let bar() recompute it
+        ax.rmax = None
+    # with no valid data left the rose is drawn empty
+    if finite.any():
+        ax.bar(
+            direction,
+            speed,
+            normed=True,
+            opening=0.8,
+            edgecolor='white',
+            cmap=cmap
+        )
+        ax.legend()
     return ax
 
 
@@ -168,29 +307,30 @@ def main() -> None:
     logger.info(f'Reading data from {args.input}')
     df = pd.read_csv(
         args.input,
+        engine='pyarrow',
         parse_dates=['Time'],
-        index_col='Time'
+        dtype={'u': np.float32, 'v': np.float32, 'st_ocean': np.float32}
+    )
+    df.set_index('Time', inplace=True)
+    df['_month'] = df.index.month.astype(np.int8)
+    df['velocidade'], df['direcao'] = compute_speed_direction(
+        df['u'].to_numpy(), df['v'].to_numpy()
     )
-    df['velocidade'] = np.sqrt(df['u']**2 + df['v']**2)
-    df['direcao'] = (np.degrees(np.arctan2(df['v'], df['u'])) + 360) % 360
+
+    # filter the depth and period once and share the slice between the table and the plot
+    subset = select_period(df[df['st_ocean'] == args.depth], args.period)
 
     logger.info('Generating distribution table')
     table = generate_current_distribution_table(
-        df=df,
-        depth=args.depth,
-        period=args.period,
+        df=subset,
         mode='bins'
     )
     table_path = os.path.join(args.output_dir, 'current_distribution_table.csv')
-    table.to_csv(table_path)
+    table.to_csv(table_path, float_format='%.2f')
     logger.info(f'Distribution table saved to {table_path}')
 
     logger.info('Plotting wind rose')
-    ax = plot_wind_rose(
-        df=df,
-        depth=args.depth,
-        period=args.period
-    )
+    ax = plot_wind_rose(df=subset)
     ax.set_title(f'Wind Rose at depth {args.depth}')
     fig_path = os.path.join(args.output_dir, 'windrose_plot.png')
     ax.figure.savefig(fig_path, dpi=300, bbox_inches='tight')
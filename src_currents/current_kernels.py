@@ -0,0 +1,69 @@
+"""
+Numba kernels used by current_analysis.py. Imported lazily so that numba stays optional.
+"""
+import math
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+
+# fastmath is left off on purpose in these kernels: it would drop the NaN checks/propagation
+@njit(parallel=True, cache=True)
+def _bin_counts(speed, direction, thr_lo, thr_width, nspeed, nthreads):
+    n = speed.shape[0]
+    step = (n + nthreads - 1) // nthreads
+    # one private table per thread, summed at the end
+    local = np.zeros((nthreads, nspeed, 12), dtype=np.int64)
+    for t in prange(nthreads):
+        for i in range(t * step, min(n, (t + 1) * step)):
+            s = (speed[i] - thr_lo) / thr_width
+            d = direction[i]
+            if not (s >= 0.0 and s < nspeed) or d != d:
+                continue
+            d_idx = int(((d + 15.0) % 360.0) / 30.0)
+            local[t, int(s), min(d_idx, 11)] += 1
+    return local.sum(axis=0)
+
+
+def bin_counts(speed, direction, thr_lo, thr_width, nspeed):
+    """
+    Count (speed bin, 30° direction sector) pairs for uniform speed bins starting at thr_lo.
+    Out-of-range speeds and NaNs are skipped.
+    """
+    # the thread count is read here: calling get_num_threads() inside the kernel prevents caching
+    return _bin_counts(speed, direction, thr_lo, thr_width, nspeed, get_num_threads())
+
+
+@njit(parallel=True, cache=True)
+def _speed_direction(u, v, to, speed, direction):
+    for i in prange(u.shape[0]):
+        ui = u[i]
+        vi = v[i]
+        speed[i] = math.hypot(ui, vi)
+        if to:
+            # compass bearing the flow goes towards, as MetPy's convention='to'
+            d = -90.0 - math.degrees(math.atan2(-vi, -ui))
+            if d <= 0.0:
+                d += 360.0
+            if ui == 0.0 and vi == 0.0:
+                d = 0.0
+        else:
+            d = math.degrees(math.atan2(vi, ui)) + 360.0
+            # d is in [180, 540], so one (exact) subtraction is the same as fmod(d, 360)
+            if d >= 360.0:
+                d -= 360.0
+        direction[i] = d
+
+
+def speed_direction(u, v, to):
+    """
+    Speed and direction from u and v in one fused pass; same results as the NumPy path of
+    current_analysis.compute_speed_direction ('to' convention when to is True, 'math' otherwise).
+    """
+    u = np.ascontiguousarray(u)
+    v = np.ascontiguousarray(v)
+    dtype = np.result_type(u, v, np.float32)
+    speed = np.empty(u.shape, dtype=dtype)
+    direction = np.empty(u.shape, dtype=dtype)
+    _speed_direction(u.ravel(), v.ravel(), to, speed.ravel(), direction.ravel())
+    return speed, direction
@@ -9,9 +9,22 @@ import matplotlib.patches as mpatches
 import matplotlib.lines as mlines
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes
 
+# Feições do Natural Earth criadas uma única vez e reutilizadas nos eixos: 10m só no mapa principal,
+# onde o detalhe é visível; o inset (25° x 25°) usa 50m, inclusive na linha de costa.
+# O mar de ambos os mapas vem do set_facecolor('lightblue') dos eixos
+COAST_10M = cfeature.NaturalEarthFeature('physical', 'coastline', '10m', edgecolor='black', facecolor='none')
+COAST_50M = cfeature.NaturalEarthFeature('physical', 'coastline', '50m', edgecolor='black', facecolor='none')
+LAND_10M = cfeature.NaturalEarthFeature('physical', 'land', '10m', edgecolor='face', facecolor='beige')
+LAND_50M = cfeature.NaturalEarthFeature('physical', 'land', '50m', edgecolor='face', facecolor='lightgray')
+
 # Abrir dados
 ds = xr.open_dataset('../BRAN_currents_Aracatu/ocean_u_1997_01.nc')
-ds['xu_ocean'] = ((ds['xu_ocean'] + 180) % 360) - 180
+# Longitudes de xu_ocean em -180-180, para comparar com LON_PONTO
+xu = ds['xu_ocean'].values.copy()
+np.add(xu, 180, out=xu)
+np.mod(xu, 360, out=xu)
+np.subtract(xu, 180, out=xu)
+ds = ds.assign_coords(xu_ocean=xu)
 
 # Ponto de interesse
 LAT_PONTO = -21.6389
@@ -30,9 +43,9 @@ fig, ax = plt.subplots(figsize=(10, 8), subplot_kw={'projection': ccrs.PlateCarr
 ax.set_extent([lon_model-1, lon_model+1, lat_model-1, lat_model+1], crs=ccrs.PlateCarree())
 
 # Recursos do mapa
-ax.add_feature(cfeature.LAND, zorder=0, facecolor='beige')
-ax.add_feature(cfeature.OCEAN, zorder=0, facecolor='lightblue')
-ax.coastlines(resolution='10m')
+ax.set_facecolor('lightblue')
+ax.add_feature(LAND_10M, zorder=0)
+ax.add_feature(COAST_10M)
 ax.gridlines(draw_labels=True, linestyle='--', alpha=0.5)
 
 # Ponto real (interesse)
@@ -58,9 +71,9 @@ ax.text(ax.get_extent()[0]+0.2, ax.get_extent()[2]+0.1, '30 km',
 # Adiciona inset com Cartopy manualmente
 inset_ax = fig.add_axes([0.65, 0.7, 0.25, 0.25], projection=ccrs.PlateCarree())
 inset_ax.set_extent([-55, -30, -35, -10], crs=ccrs.PlateCarree())
-inset_ax.coastlines(resolution='10m')
-inset_ax.add_feature(cfeature.LAND, facecolor='lightgray')
-inset_ax.add_feature(cfeature.OCEAN, facecolor='lightblue')
+inset_ax.set_facecolor('lightblue')
+inset_ax.add_feature(COAST_50M)
+inset_ax.add_feature(LAND_50M)
 inset_ax.plot(LON_PONTO, LAT_PONTO, 'r.', transform=ccrs.PlateCarree())
 inset_ax.add_patch(mpatches.Rectangle((lon_model-1, lat_model-1), 2, 2,
                                       edgecolor='red', facecolor='none',
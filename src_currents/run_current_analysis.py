@@ -9,69 +9,195 @@ Outputs for each depth and period:
 - A CSV distribution table
 - A PNG wind rose plot
 """
+import functools
+import multiprocessing
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product, repeat
+from typing import Optional
+import duckdb
 import pandas as pd
+import polars as pl
+import pyarrow.parquet as pq
 import numpy as np
-import matplotlib.pyplot as plt
-from metpy.calc import wind_speed, wind_direction
-from metpy.units import units
+import matplotlib
+matplotlib.use('Agg')  # figures are only saved to disk, also from the worker processes
+from windrose import WindroseAxes
+
+from current_analysis import (
+    compute_speed_direction, generate_current_distribution_table, plot_wind_rose, select_period
+)
+
+# bump whenever the stored columns or the speed/direction computation change,
+# so datasets written by an older version are rebuilt instead of reused
+PARQUET_CACHE_VERSION = '1'
+
+
+def convert_to_parquet(input_path: str) -> str:
+    """
+    Convert the CSV input to a snappy-compressed Parquet dataset partitioned by st_ocean, so each
+    depth lives in its own directory (st_ocean=<depth>/) and can be read on its own. Speed and
+    direction ('velocidade', 'direcao') are computed here once and stored alongside u and v.
+
+    The dataset is written next to the CSV and rebuilt when the CSV is newer than it or when it was
+    written by another PARQUET_CACHE_VERSION (recorded in a '_version' file inside the dataset).
+    Returns the dataset path (a Parquet file or directory given as input is returned as is).
+
+    Parameters:
+    -----------
+    input_path : path to the CSV file (or an existing Parquet file/dataset)
+    """
+    if input_path.endswith('.parquet') or os.path.isdir(input_path):
+        return input_path
+
+    dataset_path = os.path.splitext(input_path)[0] + '_by_depth.parquet'
+    version_path = os.path.join(dataset_path, '_version')
+    if os.path.isfile(version_path) and os.path.getmtime(version_path) >= os.path.getmtime(input_path):
+        with open(version_path) as f:
+            if f.read().strip() == PARQUET_CACHE_VERSION:
+                return dataset_path
+
+    # multithreaded lazy CSV scan reading only the needed columns, collected with the streaming engine
+    df = (
+        pl.scan_csv(input_path, try_parse_dates=True)
+        .select(['Time', 'u', 'v', 'st_ocean'])
+        .collect(engine='streaming')
+    )
+    speed, direction = compute_speed_direction(df['u'].to_numpy(), df['v'].to_numpy(), convention='to')
+    df = df.with_columns(pl.Series('velocidade', speed), pl.Series('direcao', direction))
+
+    shutil.rmtree(dataset_path, ignore_errors=True)
+    pq.write_to_dataset(df.to_arrow(), dataset_path, partition_cols=['st_ocean'], compression='snappy')
+    # written last, so an interrupted conversion is never taken as up to date
+    with open(version_path, 'w') as f:
+        f.write(PARQUET_CACHE_VERSION)
+    return dataset_path
+
+
+def parquet_source(dataset_path: str) -> str:
+    """
+    DuckDB table expression reading a Parquet file or a st_ocean-partitioned dataset.
+    """
+    if os.path.isdir(dataset_path):
+        return (f"read_parquet('{os.path.join(dataset_path, '**', '*.parquet')}', "
+                "hive_partitioning = true, hive_types = {'st_ocean': DOUBLE})")
+    return f"read_parquet('{dataset_path}')"
+
+
+def has_speed_direction(source: str) -> bool:
+    """
+    Whether the Parquet source already holds speed and direction ('velocidade', 'direcao'),
+    as the datasets written by convert_to_parquet do.
+    """
+    with duckdb.connect() as con:
+        columns = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+    return 'velocidade' in columns and 'direcao' in columns
+
+
+@functools.lru_cache(maxsize=None)
+def _connection() -> duckdb.DuckDBPyConnection:
+    """
+    DuckDB connection of the current worker process, reused for every depth it reads.
+    """
+    return duckdb.connect()
+
+
+def load_depth(source: str, depth: float, precomputed: bool) -> pd.DataFrame:
+    """
+    Read a single depth slice (indexed by Time) from the Parquet source, with speed and direction.
+
+    Parameters:
+    -----------
+    source      : DuckDB table expression returned by parquet_source
+    depth       : st_ocean value to read
+    precomputed : whether the source already holds speed and direction (see has_speed_direction)
+    """
+    select = "Time, u, v, velocidade, direcao" if precomputed else "Time, u, v"
+    df_depth = _connection().execute(f"SELECT {select} FROM {source} WHERE st_ocean = ?", [depth]).df()
+    df_depth = df_depth.set_index('Time')
+    df_depth['_month'] = df_depth.index.month.astype(np.int8)
+    if not precomputed:
+        # speed (m/s) and the compass bearing the current flows towards, as MetPy's convention='to'
+        df_depth['velocidade'], df_depth['direcao'] = compute_speed_direction(
+            df_depth['u'].to_numpy(), df_depth['v'].to_numpy(), convention='to'
+        )
+    return df_depth
+
+
+@functools.lru_cache(maxsize=None)
+def _rose_axes() -> WindroseAxes:
+    """
+    Wind rose axes of the current worker process, cleared and redrawn for every plot it makes
+    instead of creating and closing one figure per (depth, period).
+    """
+    return WindroseAxes.from_ax()
+
+
+def _analyze_depth_period(source: str, precomputed: bool, depth: float, period: Optional[str],
+                          output_dir: str) -> None:
+    """
+    Worker for one (depth, period) pair: reads its own depth slice and writes the distribution
+    table and the wind rose for that period.
+    """
+    # the (depth, period) subset is built once and shared by the table and the plot
+    subset = select_period(load_depth(source, depth, precomputed), period)
+    depth_dir = os.path.join(output_dir, f"depth_{depth}")
+    os.makedirs(depth_dir, exist_ok=True)
+    label = 'all' if period is None else period
+
+    # generate distribution table
+    table = generate_current_distribution_table(
+        df=subset,
+        mode='bins'
+    )
+    csv_path = os.path.join(depth_dir, f"distribution_{label}.csv")
+    table.to_csv(csv_path, float_format='%.2f')
+    print(f"Saved distribution table for depth {depth}, period {label}: {csv_path}")
+
+    # generate wind rose plot
+    ax = plot_wind_rose(df=subset, ax=_rose_axes())
+    ax.set_title(f"Wind Rose ({label}) at depth {depth}")
+    fig_path = os.path.join(depth_dir, f"windrose_{label}.png")
+    ax.figure.savefig(fig_path, dpi=300, bbox_inches='tight')
+    print(f"Saved wind rose for depth {depth}, period {label}: {fig_path}")
 
-from current_analysis import generate_current_distribution_table, plot_wind_rose
 
 def run_analysis(
     input_csv: str = "../BRAN_outputs/dados_u_v_Aracatu.csv",
     output_dir: str = "../BRAN_outputs/Aracatu",
-    seasons: list = [None, 'DJF', 'MAM', 'JJA', 'SON']
+    seasons: list = [None, 'DJF', 'MAM', 'JJA', 'SON'],
+    max_workers: Optional[int] = None
 ) -> None:
     """
-    Load input data, compute speed and direction, then generate distribution tables and wind roses
-    for each unique depth and each specified period (None for all data).
+    Load input data (speed and direction are computed once, when the CSV is converted to Parquet),
+    then generate distribution tables and wind roses for each unique depth and each specified period (None for all data).
+    The (depth, period) pairs are independent and are processed in parallel.
 
     Parameters:
     -----------
-    input_csv : path to the CSV file (must include 'Time','u','v','st_ocean')
-    output_dir: base directory for saving results
-    seasons   : list of periods; None for full dataset or season codes
+    input_csv  : path to the CSV file or Parquet file/dataset (must include 'Time','u','v','st_ocean')
+    output_dir : base directory for saving results
+    seasons    : list of periods; None for full dataset or season codes
+    max_workers: number of worker processes (default: os.cpu_count())
     """
     # ensure base output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
-    # load and preprocess data
-    df = pd.read_csv(input_csv, parse_dates=['Time'], index_col='Time')
-    df['velocidade'] = wind_speed(df['u'].values * units('m/s'), df['v'].values * units('m/s'))
-    df['direcao'] = wind_direction(df['u'].values * units('m/s'), df['v'].values * units('m/s'), convention='to')
-
-    # iterate over all depths
-    depths = sorted(df['st_ocean'].unique())
-    for depth in depths:
-        depth_dir = os.path.join(output_dir, f"depth_{depth}")
-        os.makedirs(depth_dir, exist_ok=True)
-
-        for period in seasons:
-            label = 'all' if period is None else period
-
-            # generate distribution table
-            table = generate_current_distribution_table(
-                df=df,
-                depth=depth,
-                period=period,
-                mode='bins'
-            )
-            csv_path = os.path.join(depth_dir, f"distribution_{label}.csv")
-            table.to_csv(csv_path)
-            print(f"Saved distribution table for depth {depth}, period {label}: {csv_path}")
-
-            # generate wind rose plot
-            ax = plot_wind_rose(
-                df=df,
-                depth=depth,
-                period=period
-            )
-            ax.set_title(f"Wind Rose ({label}) at depth {depth}")
-            fig_path = os.path.join(depth_dir, f"windrose_{label}.png")
-            ax.figure.savefig(fig_path, dpi=300, bbox_inches='tight')
-            plt.close(ax.figure)
-            print(f"Saved wind rose for depth {depth}, period {label}: {fig_path}")
+    # convert once to Parquet partitioned by depth; each worker then reads only its own depth,
+    # with the st_ocean filter pushed down into the scan (no DataFrames are pickled)
+    source = parquet_source(convert_to_parquet(input_csv))
+    with duckdb.connect() as con:
+        depths = [row[0] for row in con.execute(f"SELECT DISTINCT st_ocean FROM {source} ORDER BY st_ocean").fetchall()]
+    precomputed = has_speed_direction(source)
+
+    tasks = list(product(depths, seasons))
+    # workers are spawned, not forked: forking after Polars has started its thread pool can deadlock
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        # consuming the results re-raises any worker error here
+        list(executor.map(_analyze_depth_period, repeat(source), repeat(precomputed), *zip(*tasks),
+                          repeat(output_dir)))
 
 
 if __name__ == '__main__':
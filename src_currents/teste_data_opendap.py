@@ -1,3 +1,4 @@
+import os
 import xarray as xr
 import numpy as np
 import matplotlib.pyplot as plt
@@ -6,26 +7,41 @@ import cartopy.feature as cfeature
 
 # URL do OPeNDAP
 url = 'https://thredds.nci.org.au/thredds/dodsC/gb6/BRAN/BRAN2020/daily/ocean_u_2002_02.nc'
-ds = xr.open_dataset(url)
 
-# Coordenadas e datas
-lat = ds['yu_ocean']
-lon = ds['xu_ocean']
-depth = ds['st_ocean']
-time = ds['Time']
-time_start = np.datetime_as_string(time.values[0], unit='D')
-time_end = np.datetime_as_string(time.values[-1], unit='D')
+# Cópia local do recorte, reaproveitada nas próximas execuções
+subset_path = 'ocean_u_2002_02_Ubu_subset.nc'
 
 # Região: Porto de Ubu (ES) com buffer de 5°
 lat_min, lat_max = -25.8, -15.8
 lon_min, lon_max = -45.6, -35.6
 
-# Subset espacial e vertical
-ds_sub = ds.sel(yu_ocean=slice(lat_min, lat_max), xu_ocean=slice(lon_min % 360, lon_max % 360))
-ds_sub = ds_sub.isel(st_ocean=slice(0, 5))
+if not os.path.exists(subset_path):
+    # Abertura preguiçosa em blocos: só os hiperslabs do recorte são baixados
+    ds = xr.open_dataset(url, chunks={'Time': 1, 'st_ocean': 1, 'yu_ocean': 200, 'xu_ocean': 200})
+
+    # Subset espacial e vertical antes de qualquer leitura
+    ds_sub = ds.sel(yu_ocean=slice(lat_min, lat_max), xu_ocean=slice(lon_min % 360, lon_max % 360))
+    ds_sub = ds_sub.isel(st_ocean=slice(0, 5))
+
+    # Baixa o recorte uma única vez e salva em NetCDF local; grava num arquivo temporário e só o
+    # renomeia no fim, para que um download interrompido não deixe um recorte parcial no cache
+    tmp_path = subset_path + '.part'
+    ds_sub.to_netcdf(tmp_path)
+    ds.close()
+    os.replace(tmp_path, subset_path)
+
+ds_sub = xr.open_dataset(subset_path)
+
+# Coordenadas e datas
+lat = ds_sub['yu_ocean']
+lon = ds_sub['xu_ocean']
+depth = ds_sub['st_ocean']
+time = ds_sub['Time']
+time_start = np.datetime_as_string(time.values[0], unit='D')
+time_end = np.datetime_as_string(time.values[-1], unit='D')
 
 # Média temporal
-u_mean = ds_sub['u'].mean(dim='Time')
+u_mean = ds_sub['u'].mean(dim='Time').compute()
 
 # Projeção
 proj = ccrs.PlateCarree()
@@ -40,7 +56,8 @@ for i in range(5):
 
     im = ax.pcolormesh(
         ds_sub['xu_ocean'], ds_sub['yu_ocean'], u_plot,
-        transform=proj, cmap='RdBu_r', shading='auto', vmin=-0.5, vmax=0.5
+        transform=proj, cmap='RdBu_r', shading='auto', vmin=-0.5, vmax=0.5,
+        rasterized=True  # a malha vira uma única imagem; eixos e textos continuam vetoriais
     )
     
     ax.coastlines()
@@ -61,4 +78,7 @@ cbar.set_label('Componente zonal da corrente (m/s)')
 # Título geral com período
 fig.suptitle(f"Velocidade zonal média (u) nos 5 primeiros níveis\nPeríodo: {time_start} a {time_end}", fontsize=14)
 
+# Salvar a figura (a resolução alta fica só para o arquivo, não para a tela)
+fig.savefig('u_medio_Ubu.png', dpi=200, bbox_inches='tight')
+
 plt.show()
@@ -1,3 +1,5 @@
+import os
+import dask
 import xarray as xr
 import numpy as np
 import matplotlib.pyplot as plt
@@ -11,11 +13,17 @@ import matplotlib.colors as colors
 files_directory = '/media/daniloceano/Seagate Expansion Drive/Brazil'
 files_eta = glob(files_directory + '/*eta*.nc')
 
-ds = xr.open_mfdataset(files_eta, chunks={'time': 100})
+# Um bloco por arquivo ao longo do tempo e blocos espaciais de 512x512, com abertura paralela dos arquivos
+ds = xr.open_mfdataset(files_eta, parallel=True,
+                       chunks={'Time': -1, 'yt_ocean': 512, 'xt_ocean': 512})
 
 ds = ds.assign_coords(xt_ocean=(((ds.xt_ocean + 180) % 360) - 180))
 
-ds.eta_t.mean("Time").plot()
+# Média temporal do domínio inteiro, um bloco espacial por thread
+with dask.config.set(scheduler='threads', num_workers=os.cpu_count()):
+    eta_mean = ds.eta_t.mean("Time").compute()
+
+eta_mean.plot()
 
 # # Domínio para o campo eta_t e plotagem
 # min_lat, max_lat = -34, -28
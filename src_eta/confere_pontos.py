@@ -1,3 +1,5 @@
+import os
+import dask
 import xarray as xr
 import numpy as np
 import matplotlib.pyplot as plt
@@ -6,15 +8,29 @@ import cartopy.feature as cfeature
 from glob import glob
 import matplotlib.colors as colors
 
+# Feições do Natural Earth criadas uma única vez, na escala de 10m (a que o cartopy escolheria
+# automaticamente para este domínio), em vez das feições genéricas com escala adaptativa.
+# O mar fica com a cor 'water' do cartopy pintada no fundo dos eixos
+COAST_10M = cfeature.NaturalEarthFeature('physical', 'coastline', '10m', edgecolor='black', facecolor='none')
+BORDERS_10M = cfeature.NaturalEarthFeature('cultural', 'admin_0_boundary_lines_land', '10m',
+                                           edgecolor='black', facecolor='none')
+LAND_10M = cfeature.NaturalEarthFeature('physical', 'land', '10m', edgecolor='face',
+                                        facecolor=cfeature.COLORS['land'])
+
 # Diretório onde estão os arquivos
 files_directory = '/media/daniloceano/Seagate Expansion Drive/Brazil'
 files_eta = glob(files_directory + '/*eta*.nc')
 
-# Abrir o primeiro arquivo NetCDF
-ds = xr.open_mfdataset(files_eta)
+# Abrir os arquivos NetCDF de forma preguiçosa (dask), em paralelo e com blocos explícitos
+ds = xr.open_mfdataset(files_eta, combine='by_coords', parallel=True,
+                       chunks={'Time': 50, 'yt_ocean': 200, 'xt_ocean': 200})
 
-# Converter longitude de 0-360 para -180-180
-ds = ds.assign_coords(xt_ocean=(((ds.xt_ocean + 180) % 360) - 180))
+# Converter longitude de 0-360 para -180-180 antes do recorte do domínio
+xt = ds.xt_ocean.values.copy()
+np.add(xt, 180, out=xt)
+np.mod(xt, 360, out=xt)
+np.subtract(xt, 180, out=xt)
+ds = ds.assign_coords(xt_ocean=xt)
 
 # Domínio para o campo eta_t e plotagem
 min_lat, max_lat = -34, -28
@@ -26,18 +42,19 @@ ds = ds.sel(xt_ocean=slice(min_lon, max_lon), yt_ocean=slice(min_lat, max_lat))
 # Correção do campo de eta_t
 ds["eta_t"] = ds.eta_t
 
-# Calcular a média do campo eta_t ao longo do tempo
-eta_mean = ds.eta_t.mean("Time")
+# Calcular a média do campo eta_t ao longo do tempo, uma única vez e só no domínio recortado
+with dask.config.set(scheduler='threads', num_workers=os.cpu_count()):
+    eta_mean = ds.eta_t.mean("Time").compute()
 
 # Configurações do mapa
 fig = plt.figure(figsize=(10, 8))
 ax = plt.axes(projection=ccrs.PlateCarree())
 
 # Adicionar características geográficas
-ax.add_feature(cfeature.COASTLINE)
-ax.add_feature(cfeature.BORDERS, linestyle=':')
-ax.add_feature(cfeature.LAND, zorder=0, edgecolor='black')
-ax.add_feature(cfeature.OCEAN)
+ax.set_facecolor(cfeature.COLORS['water'])
+ax.add_feature(COAST_10M)
+ax.add_feature(BORDERS_10M, linestyle=':')
+ax.add_feature(LAND_10M, zorder=0, edgecolor='black')
 
 # Adcionar gridlines
 gl = ax.gridlines(crs=ccrs.PlateCarree(), draw_labels=True,
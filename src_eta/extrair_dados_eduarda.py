@@ -1,8 +1,7 @@
 import xarray as xr
 import pandas as pd
+import numpy as np
 import glob
-import multiprocessing as mp
-from joblib import Parallel, delayed
 
 # Caminho para os arquivos NetCDF
 data_path = "BRAN_data/ocean_eta_t_*.nc"
@@ -16,16 +15,14 @@ if not nc_files:
 
 # Carregar as estações do CIRAM a partir do arquivo CSV
 stations_file_path = "/mnt/data/Estações da rede maregráfica do CIRAM.csv"
-df_stations = pd.read_csv(stations_file_path)
+# (as coordenadas usam vírgula como separador decimal e já são lidas como float)
+df_stations = pd.read_csv(stations_file_path, decimal=",")
 print("📊 Arquivo de estações carregado com sucesso.")
 
-# Processar os dados das estações
-stations = []
-for index, row in df_stations.iterrows():
-    station_name = row['Estação'].strip()
-    latitude = float(row['Latitude(Graus, Dec)'].replace(",", "."))
-    longitude = float(row['Longitude(Graus,Dec)'].replace(",", "."))
-    stations.append({"station": station_name, "lat": latitude, "lon": longitude})
+# Processar os dados das estações de forma vetorizada
+df_stations["station"] = df_stations["Estação"].str.strip()
+df_stations = df_stations.rename(columns={"Latitude(Graus, Dec)": "lat", "Longitude(Graus,Dec)": "lon"})
+stations = df_stations[["station", "lat", "lon"]].to_dict(orient="records")
 
 print(f"\n🌍 Total de estações carregadas: {len(stations)}")
 
@@ -42,54 +39,53 @@ def load_dataset():
         print(f"❌ Erro ao carregar os arquivos NetCDF: {e}")
         exit()
 
-# Função para processar uma única estação
-def process_station(station, ds):
-    lat, lon = station["lat"], station["lon"]
-    print(f"🔍 Processando estação: {station['station']} (Lat: {lat}, Lon: {lon})")
-    records = []
+# Função para extrair todas as estações em uma única leitura vetorizada
+def extract_stations(stations, ds):
+    names = [station["station"] for station in stations]
+    lats = np.array([station["lat"] for station in stations])
+    lons = np.array([station["lon"] for station in stations])
     try:
-        # Encontrar os índices mais próximos
-        lat_idx = abs(ds["yt_ocean"] - lat).argmin()
-        lon_idx = abs(ds["xt_ocean"] - lon).argmin()
-        print(f"📍 Índices encontrados - Latitude: {lat_idx}, Longitude: {lon_idx}")
-        
-        # Extrair os valores de eta_t
-        eta_values = ds["eta_t"].isel(yt_ocean=lat_idx, xt_ocean=lon_idx).values
-        time_values = ds["Time"].values
-        
-        # Salvar os dados
-        for time, eta in zip(time_values, eta_values):
-            records.append({
-                "station": station["station"],
-                "latitude": lat,
-                "longitude": lon,
-                "time": pd.to_datetime(time),
-                "eta_t": eta
-            })
-        print(f"✅ Dados extraídos para {station['station']}.")
+        # Coordenadas como arrays NumPy, lidas uma única vez para todas as estações
+        yt_np = ds["yt_ocean"].values
+        xt_np = ds["xt_ocean"].values
+
+        # Encontrar os índices mais próximos de todas as estações de uma vez
+        lat_idx = np.abs(yt_np[:, None] - lats).argmin(axis=0)
+        lon_idx = np.abs(xt_np[:, None] - lons).argmin(axis=0)
+        for name, i, j in zip(names, lat_idx, lon_idx):
+            print(f"📍 {name} - Índices encontrados - Latitude: {i}, Longitude: {j}")
+
+        # Extrair eta_t de todas as estações em uma única execução do grafo do dask
+        eta = ds["eta_t"].isel(yt_ocean=xr.DataArray(lat_idx, dims="station"),
+                               xt_ocean=xr.DataArray(lon_idx, dims="station")).compute()
+        eta_values = eta.transpose("station", "Time").values
+        time_values = pd.to_datetime(ds["Time"].values)
     except Exception as e:
-        print(f"❌ Erro ao processar estação {station['station']}: {e}")
-    return records
+        print(f"❌ Erro ao extrair os dados das estações: {e}")
+        exit()
 
-# Número de núcleos para processamento paralelo
-num_cores = min(mp.cpu_count(), 111)  # Garantindo que não ultrapasse o disponível
-print(f"⚙️ Usando {num_cores} núcleos para processamento paralelo.\n")
+    # Montar o DataFrame em formato longo (uma linha por estação e passo de tempo)
+    n_time = time_values.size
+    df_stations = pd.DataFrame({
+        "station": np.repeat(names, n_time),
+        "latitude": np.repeat(lats, n_time),
+        "longitude": np.repeat(lons, n_time),
+        "time": np.tile(time_values, len(stations)),
+        "eta_t": eta_values.ravel()
+    })
+    print(f"✅ Dados extraídos para {len(stations)} estações.")
+    return df_stations
 
 # Carregar os dados
 dataset = load_dataset()
 
-# Processar estações em paralelo
-results = Parallel(n_jobs=num_cores)(delayed(process_station)(station, dataset) for station in stations)
-
-# Flatten dos resultados
-data_records = [item for sublist in results for item in sublist]
+# Extrair as estações
+df_results = extract_stations(stations, dataset)
 
 # Fechar dataset
 dataset.close()
 print("\n📂 Arquivos NetCDF fechados.\n")
 
-# Criar DataFrame com os dados extraídos
-df_results = pd.DataFrame(data_records)
 print(f"📊 Número total de registros extraídos: {len(df_results)}")
 
 # Salvar em CSV
@@ -1,5 +1,7 @@
-import xarray as xr
+import h5py
+import netCDF4
 import pandas as pd
+import numpy as np
 from glob import glob
 import os
 
@@ -8,43 +10,69 @@ LAT_PONTO = -21.30076
 LON_PONTO = -40.96420
 
 
+# Função para ler um atributo do HDF5 como texto (o h5py devolve bytes)
+def atributo(var, nome, padrao=None):
+    valor = var.attrs.get(nome, padrao)
+    return valor.decode() if isinstance(valor, bytes) else valor
+
+
+# Função para aplicar o mascaramento e o empacotamento do NetCDF, como o xarray faria
+def decodifica(valores, var):
+    # inteiros empacotados viram float32, ou float64 se scale_factor/add_offset forem float64
+    empacotamento = [var.attrs[nome] for nome in ("scale_factor", "add_offset") if nome in var.attrs]
+    if valores.dtype.kind in "iu":
+        valores = valores.astype(np.result_type(np.float32, *[np.asarray(a).dtype for a in empacotamento]))
+    for nome in ("_FillValue", "missing_value"):
+        if nome in var.attrs:
+            valores[np.isin(valores, var.attrs[nome])] = np.nan
+    if "scale_factor" in var.attrs:
+        valores *= np.squeeze(var.attrs["scale_factor"]).astype(valores.dtype)
+    if "add_offset" in var.attrs:
+        valores += np.squeeze(var.attrs["add_offset"]).astype(valores.dtype)
+    return valores
+
+
 # Lista e ordena todos os arquivos
 files = sorted(glob("/p1-sto-swell/danilocs/BRAN2020/BRAN_data/ocean_eta_t_*.nc"))
 
-# Cria uma lista para acumular DataFrames
-lista_dfs = []
+# Lê direto do HDF5 (sem xarray/cftime) os metadados do primeiro arquivo: a grade é a mesma em todos,
+# então os índices do gridpoint mais próximo e as unidades do tempo são calculados uma única vez
+with h5py.File(files[0], "r") as h:
+    j = int(np.abs(h["yt_ocean"][:] - LAT_PONTO).argmin())
+    i = int(np.abs(h["xt_ocean"][:] - LON_PONTO).argmin())
+    time_units = atributo(h["Time"], "units")
+    calendar = atributo(h["Time"], "calendar", "standard").lower()
+    eta_dtype = decodifica(h["eta_t"][:1, j, i], h["eta_t"]).dtype
 
+# Primeira passada (só metadados) para saber o comprimento de cada arquivo e pré-alocar os buffers
+lens = []
 for f in files:
-    # Abre o arquivo individualmente
-    ds = xr.open_dataset(f)
-    
-    # Seleciona o gridpoint mais próximo
-    pt = ds.sel(yt_ocean=LAT_PONTO, xt_ocean=LON_PONTO, method="nearest")
-    
-    # Extrai as variáveis de interesse
-    time = pt["Time"].values
-    eta  = pt["eta_t"].values
-    
-    # Monta um DataFrame temporário
-    df = pd.DataFrame({
-        "time": time,
-        "eta_t": eta
-    })
-    lista_dfs.append(df)
-    
-    # Fecha o dataset para liberar memória
-    ds.close()
-
-# Concatena todos em um único DataFrame
-df_all = pd.concat(lista_dfs, ignore_index=True)
+    with h5py.File(f, "r") as h:
+        lens.append(h["Time"].shape[0])
+offsets = np.concatenate([[0], np.cumsum(lens)])
+times_raw = np.empty(offsets[-1], dtype=np.float64)
+etas = np.empty(offsets[-1], dtype=eta_dtype)
+
+# Lê de cada arquivo só o hiperslab eta_t[:, j, i] e o tempo bruto, direto na sua fatia dos buffers
+for f, start, end in zip(files, offsets[:-1], offsets[1:]):
+    with h5py.File(f, "r") as h:
+        etas[start:end] = decodifica(h["eta_t"][:, j, i], h["eta_t"])
+        times_raw[start:end] = h["Time"][:]
+
+# Converte o tempo uma única vez para datas
+times = pd.to_datetime(netCDF4.num2date(times_raw, time_units, calendar,
+                                        only_use_cftime_datetimes=False,
+                                        only_use_python_datetimes=True))
+
+# Monta o DataFrame uma única vez, sem copiar os buffers
+df_all = pd.DataFrame({"time": times, "eta_t": etas}, copy=False)
 
 # Garante que o diretório de saída exista
 out_dir = "../BRAN_outputs"
 os.makedirs(out_dir, exist_ok=True)
 
-# Salva em CSV
-out_path = os.path.join(out_dir, "eta_t_Itabapoana.csv")
-df_all.to_csv(out_path, index=False)
+# Salva em Parquet (binário e colunar, bem mais rápido de reler que CSV)
+out_path = os.path.join(out_dir, "eta_t_Itabapoana.parquet")
+df_all.to_parquet(out_path, compression="snappy", index=False)
 
 print(f"Salvo em {out_path}")
-
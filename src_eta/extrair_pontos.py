@@ -1,5 +1,8 @@
 import os
 from glob import glob
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import xarray as xr
 import pandas as pd
 
@@ -13,73 +16,18 @@ coords_pontos = {
     'Tramandai': {'lat': -30.0050, 'lon': -50.1289}
 }
 
-# Definir delta x e delta y para buffer, pois os pontos selecionados caem em solo
-dummy_ds = xr.open_dataset(files_eta[0])
-delta_x = float(dummy_ds.xt_ocean[1] - dummy_ds.xt_ocean[0])
-delta_y = float(dummy_ds.yt_ocean[1] - dummy_ds.yt_ocean[0])
+# Número de pontos por localidade, espaçados pelo dx e dy
+n_buffers = 6
+colunas_pontos = [f"ponto_{buffer}" for buffer in range(n_buffers)]
 
-# Função para processar um único arquivo e extrair os dados das coordenadas de interesse
-def process_file(file_path, coords_pontos, dx, dy):
-    # Abrir o dataset
-    ds = xr.open_dataset(file_path)
-
-    # CPegar o campo de eta_t
-    ds["eta_t"] = ds.eta_t
-    
-    # Converter longitude de 0-360 para -180-180
-    ds = ds.assign_coords(xt_ocean=(((ds.xt_ocean + 180) % 360) - 180))
-    
-    # Extrair dados para Rio Grande e Tramandaí
-    data_rg = ds.eta_t.sel(yt_ocean=coords_pontos['Rio Grande']['lat'] - dy,
-                           xt_ocean=coords_pontos['Rio Grande']['lon'] + dx,
-                           method='nearest')
-    
-    data_ta = ds.eta_t.sel(yt_ocean=coords_pontos['Tramandai']['lat'] - dy,
-                           xt_ocean=coords_pontos['Tramandai']['lon'] + dx,
-                           method='nearest')
-    
-    # Retornar os dados extraídos para as duas localidades
-    return data_rg, data_ta
-
-# Listas para armazenar os dados de todos os arquivos
-all_data_rg = []
-all_data_ta = []
-
-# Processar todos os arquivos e armazenar os dados
-for file_path in files_eta:
-    # DataFrames temporários para cada arquivo
-    df_rg_temp = pd.DataFrame()
-    df_ta_temp = pd.DataFrame()
-
-    # Fazer 5 pontos espaçados pelo dx e dy
-    for buffer in range(6):
-        dx, dy = delta_x * buffer, delta_y * buffer
-
-        data_rg, data_ta = process_file(file_path, coords_pontos, dx, dy)
-        
-        # Adicionar os dados ao DataFrame temporário
-        df_rg_temp[f"ponto_{buffer}"] = data_rg.values
-        df_ta_temp[f"ponto_{buffer}"] = data_ta.values
-
-        # Usar tempo como índice do DataFrame
-        df_rg_temp.index = data_rg.Time.values
-        df_ta_temp.index = data_ta.Time.values
-
-    # Adicionar os DataFrames temporários à lista
-    all_data_rg.append(df_rg_temp)
-    all_data_ta.append(df_ta_temp)
-
-# Concatenar os DataFrames de todos os arquivos ao longo do eixo 0 (tempo)
-df_rg = pd.concat(all_data_rg)
-df_ta = pd.concat(all_data_ta)
-
-# Organizar o DataFrame em ordem cronológica
-df_rg = df_rg.sort_index()
-df_ta = df_ta.sort_index()
-
-# Nomear o índice do DataFrame
-df_rg.index.name = 'data'
-df_ta.index.name = 'data'
+# Função para processar um único arquivo e extrair o cubo (tempo, localidade, ponto)
+def process_file(file_path, lat_idxs, lon_idxs):
+    with xr.open_dataset(file_path) as ds:
+        # Extrair todos os pontos de todas as localidades em uma única indexação vetorizada
+        eta = ds.eta_t.isel(yt_ocean=xr.DataArray(lat_idxs, dims=['loc', 'ponto']),
+                            xt_ocean=xr.DataArray(lon_idxs, dims=['loc', 'ponto']))
+        eta = eta.transpose('Time', 'loc', 'ponto').load()
+    return eta.Time.values, eta.values
 
 # Função para adicionar cabeçalho de metadados e depois gravar o DataFrame no CSV
 def save_with_metadata(df, file_name, coords_pontos):
@@ -90,12 +38,50 @@ def save_with_metadata(df, file_name, coords_pontos):
         f.write(f"Tramandai Coordenadas (Lat, Lon): {coords_pontos['Tramandai']['lat']}, {coords_pontos['Tramandai']['lon']}\n")
         f.write(f"Delta X: {delta_x}, Delta Y: {delta_y}\n")
         f.write(f"\nDados:\n")
-    
+
     # Gravar o DataFrame no arquivo
     df.to_csv(file_name, mode='a')
 
-# Salvar os DataFrames concatenados como arquivos CSV com metadados
-save_with_metadata(df_rg, "eta_Rio_Grande.csv", coords_pontos)
-save_with_metadata(df_ta, "eta_Tramandai.csv", coords_pontos)
-
-print("Dados extraídos, metadados adicionados e salvos para Rio Grande e Tramandaí em 5 pontos consecutivos.")
+# O bloco principal fica protegido para que os processos filhos não o reexecutem
+if __name__ == '__main__':
+    # Definir delta x e delta y para buffer, pois os pontos selecionados caem em solo
+    # (a grade é a mesma em todos os arquivos, então basta o primeiro)
+    with xr.open_dataset(files_eta[0]) as dummy_ds:
+        yt_ocean = dummy_ds.yt_ocean.values
+        xt_ocean = ((dummy_ds.xt_ocean.values + 180) % 360) - 180
+        delta_x = float(dummy_ds.xt_ocean[1] - dummy_ds.xt_ocean[0])
+        delta_y = float(dummy_ds.yt_ocean[1] - dummy_ds.yt_ocean[0])
+
+    # Calcular os índices de grade mais próximos de todos os pontos (localidade x buffer) de uma vez
+    buffers = np.arange(n_buffers)
+    lats = np.array([coord['lat'] for coord in coords_pontos.values()])[:, None] - delta_y * buffers
+    lons = np.array([coord['lon'] for coord in coords_pontos.values()])[:, None] + delta_x * buffers
+    lat_idxs = np.abs(yt_ocean[:, None, None] - lats).argmin(axis=0)
+    lon_idxs = np.abs(xt_ocean[:, None, None] - lons).argmin(axis=0)
+
+    # Processar os arquivos em paralelo: a descompressão do NetCDF é feita em processos separados,
+    # já que as leituras do HDF5 são serializadas por um lock global dentro de um mesmo processo
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(process_file, files_eta, repeat(lat_idxs), repeat(lon_idxs)))
+
+    # Concatenar os resultados de todos os arquivos ao longo do tempo
+    times = np.concatenate([time for time, _ in results])
+    eta = np.concatenate([values for _, values in results])
+
+    # DataFrames com um ponto por coluna e o tempo como índice
+    df_rg = pd.DataFrame(eta[:, 0], index=times, columns=colunas_pontos)
+    df_ta = pd.DataFrame(eta[:, 1], index=times, columns=colunas_pontos)
+
+    # Organizar o DataFrame em ordem cronológica
+    df_rg = df_rg.sort_index()
+    df_ta = df_ta.sort_index()
+
+    # Nomear o índice do DataFrame
+    df_rg.index.name = 'data'
+    df_ta.index.name = 'data'
+
+    # Salvar os DataFrames concatenados como arquivos CSV com metadados
+    save_with_metadata(df_rg, "eta_Rio_Grande.csv", coords_pontos)
+    save_with_metadata(df_ta, "eta_Tramandai.csv", coords_pontos)
+
+    print("Dados extraídos, metadados adicionados e salvos para Rio Grande e Tramandaí em 5 pontos consecutivos.")